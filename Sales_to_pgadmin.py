@@ -17,11 +17,146 @@ PG_PASSWORD = os.getenv("PG_PASSWORD")
 PG_DATABASE = os.getenv("PG_DATABASE")
 PG_SCHEMA = os.getenv("PG_SCHEMA", "public")
 TABLE = "retail_sales"
-CSV_PATH = fetch_kaggle_data()
+CUBE_TABLE = "retail_sales_cube"
+CUSTOMER_KEYS_TABLE = "retail_sales_customer_keys"
+CUSTOMER_SKETCH_TABLE = "retail_sales_customer_sketch"
 
-def run_sales_to_pgadmin():
-    # 1. Read CSV from kaggle_dataset.py
-    df = pd.read_csv(CSV_PATH)
+def refresh_sales_cube(cur):
+    """
+    Rebuild the pre-aggregated rollup cube (day x category x gender x age band).
+
+    BI queries grouping by month, product_category or gender read from this table,
+    so their cost follows the number of groups instead of the number of transactions.
+    Cells only hold sums and counts; distinct customers live in the per-month sketches
+    (see refresh_customer_sketches), since a per-cell customer set would grow with
+    cells x customers. The table is truncated, not dropped, so views built on top of
+    it stay valid across loads.
+    """
+    cur.execute(sql.SQL("""
+        CREATE TABLE IF NOT EXISTS {}.{} (
+            sale_date date,
+            product_category text,
+            gender text,
+            age_band text,
+            transactions_count bigint,
+            total_amount numeric,
+            total_quantity bigint
+        );
+    """).format(sql.Identifier(PG_SCHEMA), sql.Identifier(CUBE_TABLE)))
+
+    cur.execute(sql.SQL("TRUNCATE TABLE {}.{}").format(sql.Identifier(PG_SCHEMA), sql.Identifier(CUBE_TABLE)))
+    cur.execute(sql.SQL("""
+        INSERT INTO {cube} (
+            sale_date, product_category, gender, age_band,
+            transactions_count, total_amount, total_quantity
+        )
+        SELECT
+            date,
+            product_category,
+            gender,
+            CASE
+                WHEN age IS NULL THEN NULL
+                WHEN age < 25 THEN '<25'
+                WHEN age < 35 THEN '25-34'
+                WHEN age < 45 THEN '35-44'
+                WHEN age < 55 THEN '45-54'
+                WHEN age < 65 THEN '55-64'
+                ELSE '65+'
+            END AS age_band,
+            COUNT(*),
+            SUM(total_amount),
+            SUM(quantity)
+        FROM {raw}
+        GROUP BY 1, 2, 3, 4;
+    """).format(
+        cube=sql.SQL("{}.{}").format(sql.Identifier(PG_SCHEMA), sql.Identifier(CUBE_TABLE)),
+        raw=sql.SQL("{}.{}").format(sql.Identifier(PG_SCHEMA), sql.Identifier(TABLE)),
+    ))
+
+
+def refresh_customer_sketches(cur):
+    """
+    Rebuild the per-month distinct-customer sketches (month x category x gender).
+
+    Each customer_id gets a dense integer key; a sketch is an exact bitmap with bit
+    (key - 1) set for every customer seen in the cell. All bitmaps share the same
+    length, so unique customers for any month range, YTD or category slice are
+    bit_count(bit_or(customers)) over the matching rows (Postgres 14+ for bit_count),
+    with no sort/hash distinct over raw transactions.
+
+    Cost: customer_bitmap() runs one SQL row per distinct key of a cell (zero runs
+    are filled by repeat()), but every bitmap is still an n-character string cast
+    to n bits, so each cell costs O(n) time and storage for n customers. That is why
+    sketches are kept at month grain only: the table stays at
+    months x categories x genders x n bits.
+    """
+    schema = sql.Identifier(PG_SCHEMA)
+    keys = sql.SQL("{}.{}").format(schema, sql.Identifier(CUSTOMER_KEYS_TABLE))
+    sketch = sql.SQL("{}.{}").format(schema, sql.Identifier(CUSTOMER_SKETCH_TABLE))
+    raw = sql.SQL("{}.{}").format(schema, sql.Identifier(TABLE))
+
+    cur.execute(sql.SQL("""
+        CREATE OR REPLACE FUNCTION {}.customer_bitmap(keys integer[], n integer)
+        RETURNS bit varying
+        LANGUAGE sql IMMUTABLE AS $$
+            -- one row per set key: each key emits the zero gap since the previous key plus its '1'
+            SELECT (
+                string_agg(repeat('0', k.key - k.prev_key - 1) || '1', '' ORDER BY k.key)
+                || repeat('0', n - max(k.key))
+            )::bit varying
+            FROM (
+                SELECT key, COALESCE(lag(key) OVER (ORDER BY key), 0) AS prev_key
+                FROM (SELECT DISTINCT unnest(keys) AS key) u
+                WHERE key IS NOT NULL
+            ) k
+        $$;
+    """).format(schema))
+    cur.execute(sql.SQL("""
+        CREATE TABLE IF NOT EXISTS {} (
+            customer_id text PRIMARY KEY,
+            customer_key integer NOT NULL
+        );
+    """).format(keys))
+    cur.execute(sql.SQL("""
+        CREATE TABLE IF NOT EXISTS {} (
+            month_start date,
+            product_category text,
+            gender text,
+            customers bit varying
+        );
+    """).format(sketch))
+
+    cur.execute(sql.SQL("TRUNCATE TABLE {}, {}").format(keys, sketch))
+    cur.execute(sql.SQL("""
+        INSERT INTO {keys} (customer_id, customer_key)
+        SELECT customer_id, dense_rank() OVER (ORDER BY customer_id)
+        FROM (SELECT DISTINCT customer_id FROM {raw} WHERE customer_id IS NOT NULL) c;
+    """).format(keys=keys, raw=raw))
+    cur.execute(sql.SQL("""
+        WITH n AS (
+            SELECT COUNT(*)::integer AS n FROM {keys}
+        ),
+        cells AS (
+            SELECT
+                DATE_TRUNC('month', r.date)::date AS month_start,
+                r.product_category,
+                r.gender,
+                array_agg(DISTINCT k.customer_key) AS customer_keys
+            FROM {raw} r
+            JOIN {keys} k USING (customer_id)
+            WHERE r.date IS NOT NULL
+            GROUP BY 1, 2, 3
+        )
+        INSERT INTO {sketch} (month_start, product_category, gender, customers)
+        SELECT cells.month_start, cells.product_category, cells.gender, {schema}.customer_bitmap(cells.customer_keys, n.n)
+        FROM cells CROSS JOIN n;
+    """).format(keys=keys, raw=raw, sketch=sketch, schema=schema))
+
+
+def run_sales_to_pgadmin(csv_path=None):
+    # 1. Read CSV from kaggle_dataset.py (downloaded here unless the caller already has it)
+    csv_path = csv_path or fetch_kaggle_data()
+    df = pd.read_csv(csv_path)
 
     # Normalize CSV column names
     df.columns = (
@@ -97,6 +232,10 @@ def run_sales_to_pgadmin():
                 )
                 cur.copy_expert(copy_sql, buf)
 
+                # 8. Rebuild the rollup cube from the freshly loaded rows
+                refresh_sales_cube(cur)
+                refresh_customer_sketches(cur)
+
                 # Insert a run log (optional)
                 # Create run_log table if not exists
                 cur.execute(sql.SQL("""
@@ -112,7 +251,7 @@ def run_sales_to_pgadmin():
                 cur.execute(
                     sql.SQL("INSERT INTO {}.run_log (ds, rows_loaded, source_file) VALUES (%s, %s, %s)")
                     .format(sql.Identifier(PG_SCHEMA)),
-                    (datetime.now().date(), len(df), os.path.basename(CSV_PATH))
+                    (datetime.now().date(), len(df), os.path.basename(csv_path))
                 )
 
         print(f"✅ Loaded {len(df)} rows into {PG_SCHEMA}.{TABLE} on pgadmin4")
@@ -4,10 +4,11 @@ import pandas as pd
 import kagglehub
 from datetime import datetime
 
+KAGGLE_DATASET = "mohammadtalib786/retail-sales-dataset"
 
 def main():
     # 1. Download kaggle dataset with the latest version
-    path = kagglehub.dataset_download("mohammadtalib786/retail-sales-dataset")
+    path = kagglehub.dataset_download(KAGGLE_DATASET)
     print("Path to dataset files:", path)
 
     # 2. List the files in the dataset folder after downloading, listdir
@@ -1,27 +1,38 @@
 import os
 import sys
+import argparse
 import traceback
-from datetime import datetime
+from datetime import datetime, date
 from pathlib import Path
 
+from pipeline_checkpoints import CheckpointStore, fingerprint, file_fingerprint, retry_with_backoff
+
 # =========================================================
 # Imports from your modular scripts
 # =========================================================
+try:
+    from kaggle_dataset import main as fetch_kaggle_data, KAGGLE_DATASET
+except ImportError:
+    KAGGLE_DATASET = ""
+    def fetch_kaggle_data():
+        raise ImportError("Could not import 'main' from kaggle_dataset.py")
+
 try:
     from Sales_to_pgadmin import run_sales_to_pgadmin
 except ImportError:
-    def run_sales_to_pgadmin():
+    def run_sales_to_pgadmin(csv_path=None):
         raise ImportError("Could not import 'run_sales_to_pgadmin' from sales_to_pgadmin.py")
 
 try:
     from sql_scripts.run_all_bi_sql import run_all_bi_queries
 except ImportError:
-    def run_all_bi_queries():
+    def run_all_bi_queries(checkpoints=None, upstream=""):
         raise ImportError("Could not import 'run_all_bi_queries' from run_all_bi_sql.py")
 
 try:
-    from report_scripts.kaggle_ecom_report import build_report
+    from report_scripts.kaggle_ecom_report import build_report, BI_CSV_DIR
 except ImportError:
+    BI_CSV_DIR = Path(__file__).resolve().parent / "data_outputs" / "bi"
     def build_report():
         raise ImportError("Could not import 'build_report' from kaggle_ecom_report.py")
 
@@ -44,36 +55,64 @@ def log(msg: str, level: str = "INFO"):
 # =========================================================
 # Main Orchestration Logic
 # =========================================================
-def run_pipeline():
+def run_pipeline(resume: bool = False):
+    """
+    Run fetch → load → BI SQL → report.
+
+    With resume=True, every unit (stage or SQL file) already completed on the same
+    inputs is skipped, so a failed run restarts at its first incomplete unit.
+    Without it, previous checkpoints are cleared and everything runs again.
+    Failed units are retried with backoff (see pipeline_checkpoints).
+    """
     start_time = datetime.now()
     log("Starting Full BI Orchestration Pipeline", "STEP")
     log(f"Start Time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}", "INFO")
 
+    checkpoints = CheckpointStore()
+    if resume:
+        log(f"Resuming from checkpoints in {checkpoints.path.name}", "INFO")
+    else:
+        checkpoints.clear()
+
     try:
         # ---------------------------------------------
         # 1️⃣ Extract & Load to Postgres
         # ---------------------------------------------
         log("Step 1: Loading Kaggle data → PostgreSQL", "STEP")
-        run_sales_to_pgadmin()
+        # The dataset snapshot is stamped with today's DS, so one download per day is enough
+        fetch_fp = fingerprint(KAGGLE_DATASET, date.today().isoformat())
+        csv_path = checkpoints.run("stage:fetch", fetch_fp, fetch_kaggle_data)
+        if not csv_path or not Path(csv_path).exists():
+            # checkpoint survived but the CSV did not: download again
+            csv_path = retry_with_backoff(fetch_kaggle_data, label="stage:fetch")
+            checkpoints.mark_done("stage:fetch", fetch_fp, csv_path)
+
+        load_fp = file_fingerprint(csv_path)
+        checkpoints.run("stage:load", load_fp, lambda: run_sales_to_pgadmin(csv_path))
         log("✅ Step 1 Completed Successfully", "SUCCESS")
 
         # ---------------------------------------------
         # 2️⃣ Run SQL Transformations (BI Views)
         # ---------------------------------------------
         log("Step 2: Running BI SQL transformations", "STEP")
-        run_all_bi_queries()
-        log("✅ Step 2 Completed Successfully", "SUCCESS")
+        failed = run_all_bi_queries(checkpoints=checkpoints, upstream=load_fp)
+        if failed:
+            log(f"⚠️ Step 2 finished with {len(failed)} failed file(s); re-run with --resume to retry only those", "ERROR")
+        else:
+            log("✅ Step 2 Completed Successfully", "SUCCESS")
 
         # ---------------------------------------------
         # 3️⃣ Generate Report
         # ---------------------------------------------
         log("Step 3: Building Excel Report and Charts", "STEP")
-        build_report()
+        report_fp = fingerprint(*(file_fingerprint(p) for p in sorted(Path(BI_CSV_DIR).glob("*.csv"))))
+        checkpoints.run("stage:report", report_fp, build_report)
         log("✅ Step 3 Completed Successfully", "SUCCESS")
 
     except Exception as e:
         log("❌ Pipeline failed!", "ERROR")
         log(str(e), "ERROR")
+        log("Completed units are checkpointed; run again with --resume to continue from here", "INFO")
         traceback.print_exc()
         sys.exit(1)
 
@@ -86,4 +125,7 @@ def run_pipeline():
 # Entry Point
 # =========================================================
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the full retail sales BI pipeline.")
+    parser.add_argument("--resume", action="store_true", help="skip stages and SQL files already completed on the same inputs")
+    args = parser.parse_args()
+    run_pipeline(resume=args.resume)
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Checkpoints for resumable pipeline runs.
+
+A unit of work (a pipeline stage or a single SQL file) is recorded as done together
+with a fingerprint of its inputs. A resumed run skips every unit whose fingerprint
+still matches and starts at the first incomplete one. Units failing with a transient
+error (lost connection, network, I/O) are retried with exponential backoff before
+the error is raised; anything else fails immediately.
+
+State lives in a small JSON file (CHECKPOINT_PATH) that is rewritten atomically
+after every completed unit.
+"""
+import os
+import json
+import time
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import psycopg2
+except ImportError:  # checkpoints also work for stages that never touch Postgres
+    psycopg2 = None
+
+BASE_DIR = Path(__file__).resolve().parent
+CHECKPOINT_PATH = BASE_DIR / ".pipeline_checkpoints.json"
+
+RETRY_ATTEMPTS = int(os.getenv("PIPELINE_RETRY_ATTEMPTS", "3"))
+RETRY_BACKOFF_S = float(os.getenv("PIPELINE_RETRY_BACKOFF_S", "5"))
+
+# Errors worth another attempt: connection/server hiccups and network or file I/O
+# (OSError covers ConnectionError and TimeoutError). SQL errors (ProgrammingError,
+# DataError, ...) and bad input (ValueError) fail fast.
+TRANSIENT_ERRORS = (OSError,) + ((psycopg2.OperationalError,) if psycopg2 else ())
+
+
+def fingerprint(*parts) -> str:
+    """sha256 over the given parts (str/bytes/anything str()-able), in order."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_fingerprint(path) -> str:
+    """sha256 of a file's content, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def is_retryable(e: BaseException) -> bool:
+    """An explicit retryable attribute wins; otherwise only TRANSIENT_ERRORS are retried."""
+    retryable = getattr(e, "retryable", None)
+    if retryable is not None:
+        return bool(retryable)
+    return isinstance(e, TRANSIENT_ERRORS)
+
+
+def retry_with_backoff(fn, attempts: int = RETRY_ATTEMPTS, backoff_s: float = RETRY_BACKOFF_S, label: str = "", on_retry=None):
+    """
+    Call fn() until it succeeds or attempts are exhausted.
+
+    Notes:
+    - Waits backoff_s, 2 * backoff_s, 4 * backoff_s, ... between attempts.
+    - on_retry (optional) runs after each failure, e.g. conn.rollback.
+    - Only transient errors are retried (see is_retryable): e.g. UndefinedTable, a
+      DataError or a ValueError is raised on the first attempt, and so is
+      anything with retryable = False (e.g. a blown query budget).
+    - The last exception is re-raised.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if on_retry is not None:
+                on_retry()
+            if attempt == attempts or not is_retryable(e):
+                raise
+            delay = backoff_s * 2 ** (attempt - 1)
+            print(f"🔁 {label or 'unit'} failed (attempt {attempt}/{attempts}): {e} — retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+
+class CheckpointStore:
+    """
+    JSON-backed record of completed units: {unit: {"fingerprint", "completed_at", "result"}}.
+
+    Usage:
+    - store.run(unit, fp, fn) → skips fn when unit is done with the same fp, otherwise
+      runs it with retry_with_backoff and records it. Returns fn's (or the stored) result.
+    - store.clear() starts from scratch (a run without --resume).
+    """
+
+    fingerprint = staticmethod(fingerprint)
+
+    def __init__(self, path: Path = CHECKPOINT_PATH):
+        self.path = Path(path)
+        self.state = {}
+        if self.path.exists():
+            try:
+                self.state = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.state = {}
+
+    def _save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def clear(self):
+        self.state = {}
+        self._save()
+
+    def is_done(self, unit: str, fp: str) -> bool:
+        entry = self.state.get(unit)
+        return bool(entry) and entry.get("fingerprint") == fp
+
+    def mark_done(self, unit: str, fp: str, result=None):
+        self.state[unit] = {
+            "fingerprint": fp,
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+            "result": result,
+        }
+        self._save()
+
+    def run(self, unit: str, fp: str, fn, on_retry=None):
+        if self.is_done(unit, fp):
+            print(f"⏭ Skipping {unit} (checkpoint matches)")
+            return self.state[unit].get("result")
+        result = retry_with_backoff(fn, label=unit, on_retry=on_retry)
+        try:
+            json.dumps(result)
+        except TypeError:
+            result = None
+        self.mark_done(unit, fp, result)
+        return result
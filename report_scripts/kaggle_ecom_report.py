@@ -21,6 +21,7 @@ How to use:
 # =========================================================
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
@@ -60,6 +61,14 @@ MANUAL_CSV_LIST = [
 "09_view_percentiles_by_order_amount"
 ]
 
+# MAX_PLOT_POINTS: points budget per time-series line (min/max downsampling); the first and
+# last points are always kept, so up to MAX_PLOT_POINTS + 2 points are drawn. Set to 0 to plot every point
+MAX_PLOT_POINTS = int(os.getenv("REPORT_MAX_PLOT_POINTS", "2000"))
+
+# TIMESERIES_METRICS: preferred value columns for the time-series chart, in order
+# (falls back to the first numeric column other than year/month)
+TIMESERIES_METRICS = ["total_revenue", "total_amount", "total_sales", "month_total_amount"]
+
 # =========================================================
 # 2. Helper functions — detailed notes for each function
 # =========================================================
@@ -103,7 +112,8 @@ def try_parse_date_column(df: pd.DataFrame):
     Attempt to find a sensible date-like column in the DataFrame.
 
     Strategy:
-    1. Look for common column names (case-insensitive): date, ds, order_date, sale_date, transaction_date.
+    1. Look for common column names (case-insensitive): date, ds, order_date, sale_date, transaction_date,
+       month_start, period_start.
        For each candidate, attempt pd.to_datetime() with errors='coerce' and check whether any values parsed.
     2. If none of the candidates worked, inspect dtypes and return the first datetime64-like column found.
     3. If still nothing, return None.
@@ -115,7 +125,7 @@ def try_parse_date_column(df: pd.DataFrame):
     - Many CSVs use different date column names. This function tries practical heuristics so downstream
       plotting code can choose a date axis automatically.
     """
-    candidates = [c for c in df.columns if c.lower() in ("date", "ds", "order_date", "sale_date", "transaction_date")]
+    candidates = [c for c in df.columns if c.lower() in ("date", "ds", "order_date", "sale_date", "transaction_date", "month_start", "period_start")]
     for c in candidates:
         try:
             parsed = pd.to_datetime(df[c], errors="coerce")
@@ -143,34 +153,84 @@ def numeric_columns(df: pd.DataFrame):
     return [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
 
 
-def timeseries_plot(df: pd.DataFrame, date_col: str, value_col: str):
+def minmax_downsample(values: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Pick the positions to plot so a long series keeps its shape with about max_points points.
+
+    Notes:
+    - Input: values (1-D numeric array, already in x order), max_points (int budget; <= 0 disables)
+    - Returns: sorted positional indices into values (all positions when no downsampling is needed)
+    - Splits the series into max_points // 2 equal buckets and keeps the min and the max of each,
+      plus the first and last point, so spikes and dips survive while flat stretches are thinned.
+    - At most max_points + 2 positions are returned: the first and last points are added on top of
+      the bucket extremes (fewer when they coincide).
+    - Fully vectorized: one lexsort by (bucket, value) gives every bucket's min (first) and max (last).
+    """
+    n = len(values)
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+    n_buckets = max(max_points // 2, 1)
+    bucket = (np.arange(n) * n_buckets) // n
+    order = np.lexsort((values, bucket))
+    starts = np.searchsorted(bucket, np.arange(n_buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+
+
+def timeseries_metric(df: pd.DataFrame, date_col: str):
+    """
+    Pick the value column to chart against date_col.
+
+    Notes:
+    - Returns the first TIMESERIES_METRICS column present, else the first numeric column
+      that is not the date or a year/month part, else None.
+    """
+    for c in TIMESERIES_METRICS:
+        if c in df.columns and pd.api.types.is_numeric_dtype(df[c]):
+            return c
+    for c in numeric_columns(df):
+        if c != date_col and c.lower() not in ("year", "month"):
+            return c
+    return None
+
+
+def timeseries_plot(df: pd.DataFrame, date_col: str, value_col: str, max_points: int = None, freq: str = "D"):
     """
-    Create a daily time-series matplotlib Figure for the specified date and value columns.
+    Create a time-series matplotlib Figure for the specified date and value columns.
 
     Inputs:
     - df: DataFrame containing date_col and value_col
     - date_col: column name containing dates (will be coerced to datetime)
-    - value_col: numeric column to aggregate (sum) by day
+    - value_col: numeric column to aggregate (sum) per period
+    - max_points: plotted points budget (defaults to MAX_PLOT_POINTS)
+    - freq: resample frequency ('D' by default); None keeps the existing periods (for
+      month_start / period_start datasets that are already one row per period)
 
     Behavior:
-    - Coerces date_col to datetime (errors -> NaT)
+    - Coerces date_col to datetime (errors -> NaT) without copying the whole DataFrame
     - Drops rows where either date_col or value_col is missing
-    - Aggregates by day (resample 'D') using sum
+    - Aggregates by freq (resample) using sum, or by date when freq is None
+    - Downsamples the series with minmax_downsample so drawing cost stays flat as history grows
     - If aggregated series is empty, returns a figure with a short message
 
     Returns:
     - matplotlib Figure object (caller should save and close using safe_save_png)
     """
-    tmp = df.copy()
-    tmp[date_col] = pd.to_datetime(tmp[date_col], errors="coerce")
-    tmp = tmp.dropna(subset=[date_col, value_col])
+    max_points = MAX_PLOT_POINTS if max_points is None else max_points
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    values = df[value_col]
+    mask = (dates.notna() & values.notna()).to_numpy()
     fig, ax = plt.subplots(figsize=(10, 4))
-    if tmp.empty:
+    if not mask.any():
         ax.text(0.5, 0.5, "No data for time series", ha="center")
         return fig
-    series = tmp.set_index(date_col).sort_index()[value_col].resample("D").sum()
-    ax.plot(series.index, series.values)
-    ax.set_title(f"Daily {value_col}")
+    series = pd.Series(values.to_numpy()[mask], index=pd.DatetimeIndex(dates.to_numpy()[mask]))
+    series = series.sort_index()
+    series = series.resample(freq).sum() if freq else series.groupby(level=0).sum()
+    idx = minmax_downsample(series.to_numpy(), max_points)
+    ax.plot(series.index[idx], series.to_numpy()[idx])
+    title = f"{value_col} by {date_col}"
+    ax.set_title(title if len(idx) == len(series) else f"{title} ({len(idx)} of {len(series)} points)")
     ax.set_xlabel("Date")
     ax.set_ylabel(value_col)
     ax.grid(True)
@@ -270,10 +330,8 @@ def build_report(
     Steps:
     1. Gather datasets (respect MANUAL_CSV_LIST)
     2. Create an Excel workbook in REPORTS_DIR/report_ecom_kaggle.xlsx with one sheet per dataset
-    3. For each dataset:
-         - Detect simple KPIs (candidate columns like total_amount/revenue)
-         - Generate timeseries PNG if date + numeric metric exist
-         - Generate top-N barplot PNG if a categorical column exists
+    3. For each dataset with a date column and a numeric metric (see timeseries_metric):
+         - Generate a downsampled timeseries PNG (timeseries_plot)
     4. Save images to CHARTS_DIR and Excel workbook to REPORTS_DIR
     """
     now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -300,6 +358,20 @@ def build_report(
 
     print(f"✅ Excel report saved to: {excel_path}")
 
+    # Time-series charts: period-level datasets keep their periods, row-level ones resample by day
+    for name, df in datasets.items():
+        date_col = try_parse_date_column(df)
+        value_col = timeseries_metric(df, date_col) if date_col else None
+        if value_col is None:
+            continue
+        freq = None if date_col.lower() in ("month_start", "period_start") else "D"
+        out_path = CHARTS_DIR / f"{name}_timeseries.png"
+        try:
+            safe_save_png(timeseries_plot(df, date_col, value_col, freq=freq), out_path)
+            print(f"🖼️ Chart saved: {out_path.name}")
+        except Exception as e:
+            print(f"⚠️ Could not chart {name}: {e}", file=sys.stderr)
+
 # =========================================================
 # 5. Script entry point
 # =========================================================
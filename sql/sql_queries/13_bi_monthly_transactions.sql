@@ -3,11 +3,11 @@
 -- Purpose: Business data check
 -- ===========================================
 
--- Dates Group by Month, no duplicate transactions
+-- Dates Group by Month, no duplicate transactions (answered from the rollup cube)
 SELECT
-  date_trunc('month', date)       AS month,
-  COUNT(*)                       AS transactions_per_month
-FROM public.retail_sales
+  date_trunc('month', sale_date)          AS month,
+  SUM(transactions_count)::bigint        AS transactions_per_month
+FROM public.retail_sales_cube
 GROUP BY month
 ORDER BY month;
 
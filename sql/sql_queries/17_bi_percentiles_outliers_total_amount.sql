@@ -1,6 +1,7 @@
 -- ===========================================
 -- 17_bi_percentiles_outliers_total_amount.sql
 -- Purpose: Total amount outliers data insights
+-- Budget: max_runtime=60s max_rows=10 work_mem=64MB
 -- ===========================================
 
 
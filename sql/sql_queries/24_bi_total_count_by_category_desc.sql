@@ -3,12 +3,12 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- Total Count by Category DESC, total values and unique category count
+-- Total Count by Category DESC, total values and unique category count (answered from the rollup cube)
 WITH per_cat AS (
   SELECT
     product_category,
-    COUNT(*) AS order_cnt_by_cat
-  FROM retail_sales
+    SUM(transactions_count)::bigint AS order_cnt_by_cat
+  FROM retail_sales_cube
   WHERE product_category IS NOT NULL
   GROUP BY product_category
 ),
@@ -3,31 +3,26 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- Distinct Categories total_amount by gender
-WITH sales_by_cat AS (
+-- Distinct Categories total_amount by gender (answered from the rollup cube)
+WITH sales_by_cat_gender AS (
   SELECT
     product_category,
-    SUM(total_amount) AS category_total,
-	SUM(quantity) AS quantity_sold
-  FROM public.retail_sales
-  GROUP BY product_category
+    gender,
+    SUM(total_amount) AS total_sales_by_gender,
+    SUM(transactions_count)::bigint AS transactions_count,
+    SUM(total_quantity) AS quantity_by_gender
+  FROM public.retail_sales_cube
+  GROUP BY product_category, gender
 )
 SELECT
-  public.retail_sales.product_category,
-  public.retail_sales.gender,
-  SUM(public.retail_sales.total_amount) AS total_sales_by_gender,
-  COUNT(*) AS transactions_count,
-  sales_by_cat.category_total,
-  sales_by_cat.quantity_sold,
-  SUM(public.retail_sales.total_amount) * 100 / NULLIF(sales_by_cat.category_total, 0) AS pct_of_category
-FROM public.retail_sales
-LEFT JOIN sales_by_cat
-  ON public.retail_sales.product_category = sales_by_cat.product_category
-GROUP BY
-  public.retail_sales.product_category,
-  public.retail_sales.gender,
-  sales_by_cat.category_total,
-  sales_by_cat.quantity_sold
+  product_category,
+  gender,
+  total_sales_by_gender,
+  transactions_count,
+  SUM(total_sales_by_gender) OVER (PARTITION BY product_category) AS category_total,
+  SUM(quantity_by_gender) OVER (PARTITION BY product_category)::bigint AS quantity_sold,
+  total_sales_by_gender * 100 / NULLIF(SUM(total_sales_by_gender) OVER (PARTITION BY product_category), 0) AS pct_of_category
+FROM sales_by_cat_gender
 ORDER BY
-  public.retail_sales.product_category,
-  total_sales_by_gender DESC;
\ No newline at end of file
+  product_category,
+  total_sales_by_gender DESC;
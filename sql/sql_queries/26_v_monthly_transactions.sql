@@ -3,16 +3,32 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- Total transactions by month
+-- Total transactions by month (answered from the rollup cube)
 
-CREATE VIEW monthly_transactions AS
-SELECT
-    DATE_TRUNC('month', date)::date AS month_start,
-    EXTRACT(YEAR FROM date) AS year,
-    EXTRACT(MONTH FROM date) AS month,
+CREATE OR REPLACE VIEW monthly_transactions AS
+WITH monthly AS (
+  SELECT
+    DATE_TRUNC('month', sale_date)::date AS month_start,
     SUM(total_amount) AS total_revenue,
-    SUM(quantity) AS total_units,
-    COUNT(DISTINCT customer_id) AS unique_customers
-FROM public.retail_sales
-GROUP BY 1, 2, 3
-ORDER BY month_start;
+    SUM(total_quantity)::bigint AS total_units
+  FROM public.retail_sales_cube
+  GROUP BY 1
+),
+monthly_customers AS (
+  -- union of the per-month customer bitmaps, no distinct scan
+  SELECT
+    month_start,
+    bit_count(bit_or(customers)) AS unique_customers
+  FROM public.retail_sales_customer_sketch
+  GROUP BY 1
+)
+SELECT
+    m.month_start,
+    EXTRACT(YEAR FROM m.month_start) AS year,
+    EXTRACT(MONTH FROM m.month_start) AS month,
+    m.total_revenue,
+    m.total_units,
+    COALESCE(mc.unique_customers, 0) AS unique_customers
+FROM monthly m
+LEFT JOIN monthly_customers mc USING (month_start)
+ORDER BY m.month_start;
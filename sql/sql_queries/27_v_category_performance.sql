@@ -3,21 +3,21 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- Product Category Performance
+-- Product Category Performance (answered from the rollup cube)
 
-CREATE VIEW product_category_performance AS (
+CREATE OR REPLACE VIEW product_category_performance AS (
 WITH total_agg_g AS (
   SELECT
     product_category,
     SUM(total_amount) AS total_sales,
-    SUM(quantity) AS total_qty_sold,	
-    COUNT(*) FILTER (WHERE lower(trim(gender)) = 'male') AS transactions_male,
-    SUM(quantity) FILTER (WHERE lower(trim(gender)) = 'male') AS t_quantity_male,
+    SUM(total_quantity)::bigint AS total_qty_sold,
+    COALESCE(SUM(transactions_count) FILTER (WHERE lower(trim(gender)) = 'male'), 0)::bigint AS transactions_male,
+    SUM(total_quantity) FILTER (WHERE lower(trim(gender)) = 'male')::bigint AS t_quantity_male,
     SUM(total_amount) FILTER (WHERE lower(trim(gender)) = 'male') AS t_amount_male,
-    COUNT(*) FILTER (WHERE lower(trim(gender)) = 'female') AS transactions_female,
+    COALESCE(SUM(transactions_count) FILTER (WHERE lower(trim(gender)) = 'female'), 0)::bigint AS transactions_female,
     SUM(total_amount) FILTER (WHERE lower(trim(gender)) = 'female') AS t_amount_female,
-    SUM(quantity) FILTER (WHERE lower(trim(gender)) = 'female') AS t_quantity_female
-  FROM public.retail_sales
+    SUM(total_quantity) FILTER (WHERE lower(trim(gender)) = 'female')::bigint AS t_quantity_female
+  FROM public.retail_sales_cube
   GROUP BY product_category
 )
 SELECT
@@ -3,21 +3,17 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- MoM total_amount/revenue performance
+-- MoM total_amount/revenue performance (projection of timeseries_metrics_month, single LAG pass)
 
-CREATE VIEW monthly_mom AS
+CREATE OR REPLACE VIEW monthly_mom AS
 SELECT
-    month_start,
+    period_start AS month_start,
     year,
     month,
     total_revenue,
     total_units,
     unique_customers,
-    LAG(total_revenue) OVER (ORDER BY month_start) AS prev_month_revenue,
-    ROUND(
-        (total_revenue - LAG(total_revenue) OVER (ORDER BY month_start))
-        / NULLIF(LAG(total_revenue) OVER (ORDER BY month_start), 0) * 100,
-        2
-    ) AS mom_revenue_growth_pct
-FROM monthly_transactions
+    prev_period_revenue AS prev_month_revenue,
+    pop_revenue_growth_pct AS mom_revenue_growth_pct
+FROM timeseries_metrics_month
 ORDER BY month_start;
@@ -3,22 +3,16 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- YTD total_amount/revenue and units sold performance
+-- YTD total_amount/revenue and units sold performance (projection of timeseries_metrics_month)
 
-CREATE VIEW monthly_ytd_performance AS
+CREATE OR REPLACE VIEW monthly_ytd_performance AS
 SELECT
     year,
     month,
-    month_start,
+    period_start AS month_start,
     total_revenue,
-    SUM(total_revenue) OVER (
-        PARTITION BY year
-        ORDER BY month_start
-    ) AS ytd_revenue,
+    ytd_revenue,
     total_units,
-    SUM(total_units) OVER (
-        PARTITION BY year
-        ORDER BY month_start
-    ) AS ytd_units
-FROM monthly_transactions
-ORDER BY month_start;
\ No newline at end of file
+    ytd_units
+FROM timeseries_metrics_month
+ORDER BY month_start;
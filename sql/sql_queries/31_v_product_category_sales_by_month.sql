@@ -3,17 +3,17 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- Product category sales by Month
+-- Product category sales by Month (answered from the rollup cube)
 
-CREATE VIEW product_category_sales_by_month as (
+CREATE OR REPLACE VIEW product_category_sales_by_month as (
 WITH monthly AS (
   SELECT
     product_category,
-    DATE_TRUNC('month', date)::date AS month_start,
-    SUM(total_amount)   AS month_total_amount,
-    SUM(quantity)       AS month_total_quantity,
-    COUNT(*)            AS transactions_count
-  FROM public.retail_sales
+    DATE_TRUNC('month', sale_date)::date AS month_start,
+    SUM(total_amount)                    AS month_total_amount,
+    SUM(total_quantity)::bigint          AS month_total_quantity,
+    SUM(transactions_count)::bigint      AS transactions_count
+  FROM public.retail_sales_cube
   WHERE product_category IS NOT NULL
   GROUP BY 1, 2
 )
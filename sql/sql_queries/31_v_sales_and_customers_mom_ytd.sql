@@ -3,20 +3,18 @@
 -- Purpose: Business data insights
 -- ===========================================
 
--- YTD total_amount/revenue, unique customers and units sold performance
+-- YTD total_amount/revenue, unique customers and units sold performance (projection of timeseries_metrics_month, no joins)
 
 CREATE OR REPLACE VIEW sales_and_customers_mom_ytd AS
 SELECT
-    s.month_start,
-    s.year,
-    s.month,
-    s.total_revenue,
-    s.total_units,
-    s.unique_customers,
-    m.mom_revenue_growth_pct,
-    y.ytd_revenue,
-    y.ytd_units
-FROM monthly_transactions s
-LEFT JOIN monthly_mom m USING (month_start, year, month, total_revenue)
-LEFT JOIN monthly_ytd_performance y USING (month_start, year, month, total_revenue)
-ORDER BY s.month_start;
\ No newline at end of file
+    period_start AS month_start,
+    year,
+    month,
+    total_revenue,
+    total_units,
+    unique_customers,
+    pop_revenue_growth_pct AS mom_revenue_growth_pct,
+    ytd_revenue,
+    ytd_units
+FROM timeseries_metrics_month
+ORDER BY month_start;
@@ -0,0 +1,29 @@
+-- ===========================================
+-- 32_bi_unique_customers_from_sketches.sql
+-- Purpose: Business data insights
+-- ===========================================
+
+-- Unique, YTD unique, returning and new customers by month from the customer bitmaps (no distinct scan)
+WITH monthly AS (
+  SELECT
+    month_start,
+    bit_or(customers) AS customers
+  FROM public.retail_sales_customer_sketch
+  GROUP BY month_start
+),
+running AS (
+  SELECT
+    month_start,
+    customers,
+    bit_or(customers) OVER (PARTITION BY EXTRACT(YEAR FROM month_start) ORDER BY month_start) AS ytd_customers,
+    bit_or(customers) OVER (ORDER BY month_start ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS seen_before
+  FROM monthly
+)
+SELECT
+  month_start,
+  bit_count(customers) AS unique_customers,
+  bit_count(ytd_customers) AS ytd_unique_customers,
+  COALESCE(bit_count(customers & seen_before), 0) AS returning_customers,
+  bit_count(customers) - COALESCE(bit_count(customers & seen_before), 0) AS new_customers
+FROM running
+ORDER BY month_start;
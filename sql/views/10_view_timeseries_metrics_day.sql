@@ -0,0 +1 @@
+SELECT * FROM timeseries_metrics_day;
\ No newline at end of file
@@ -0,0 +1 @@
+SELECT * FROM timeseries_metrics_week;
\ No newline at end of file
@@ -0,0 +1 @@
+SELECT * FROM timeseries_metrics_month;
\ No newline at end of file
@@ -1,12 +1,54 @@
-# Script ideal to run queries manually from both folders sql_queries and views
+#!/usr/bin/env python3
+"""
+Interactive runner for SQL files in sql/sql_queries and sql/views.
+
+Behavior:
+ - Keeps ONE PostgreSQL connection open for the whole session.
+ - Files using $1, $2, ... placeholders are PREPAREd once and re-executed with
+   new parameters (the prepared statement is refreshed when the file changes).
+ - SELECT/WITH results are streamed page by page through a server-side cursor,
+   either to the terminal or to a CSV file, so large results never sit in memory.
+ - statement_timeout is enforced on the session; Ctrl-C cancels the running query
+   server-side and returns to the prompt.
+ - Execution and fetch times are printed for each query.
+
+Usage:
+ - REPL:      python sql_scripts/manual_sql_query_script.py
+ - One-shot:  python sql_scripts/manual_sql_query_script.py 05_bi_dataset_quick_sample.sql 01_view_dataset_totals.sql --csv
+ - Params:    python sql_scripts/manual_sql_query_script.py my_query.sql -p 2023-01-01 -p beauty
+
+REPL commands:
+ - \\run <file> [param ...]   run a SQL file (looked up in sql_queries, then views)
+ - \\files                    list available SQL files
+ - \\page <rows>              rows fetched and printed per page
+ - \\timeout <ms>             change statement_timeout
+ - \\out <path|off>           stream results into a CSV file instead of the terminal
+ - \\q                        quit
+ - anything else             ad-hoc SQL, terminated by ';'
+"""
+
+# ============================================================
+# 1️⃣ Import libraries and load environment variables
+# ============================================================
 import os
+import re
+import sys
+import csv
+import time
+import shlex
+import argparse
+from pathlib import Path
 import psycopg2
+import psycopg2.extras
+from psycopg2 import sql
 import pandas as pd
 from dotenv import load_dotenv
 
-# 1. Load environment variables (PostgreSQL credentials)
 load_dotenv()
 
+# ============================================================
+# 2️⃣ Load PostgreSQL credentials and runner defaults from .env
+# ============================================================
 PG_HOST = os.getenv("PG_HOST", "localhost")
 PG_PORT = os.getenv("PG_PORT", "5432")
 PG_USER = os.getenv("PG_USER")
@@ -14,75 +56,312 @@ PG_PASSWORD = os.getenv("PG_PASSWORD")
 PG_DATABASE = os.getenv("PG_DATABASE")
 PG_SCHEMA = os.getenv("PG_SCHEMA", "public")
 
-# 2. Define your project structure
-BASE_DIR = r"C:\Users\admin\.cursor\retail-sales-analytics-kaggle"
-SQL_QUERIES_DIR = os.path.join(BASE_DIR, "sql", "sql_queries")
-VIEWS_DIR = os.path.join(BASE_DIR, "sql", "views")
+DEFAULT_PAGE_SIZE = int(os.getenv("SQL_PAGE_SIZE", "500"))
+DEFAULT_STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "60000"))
+
+# ============================================================
+# 3️⃣ Define project paths
+# ============================================================
+BASE_DIR = Path(__file__).resolve().parents[1]
+SQL_QUERIES_DIR = BASE_DIR / "sql" / "sql_queries"
+VIEWS_DIR = BASE_DIR / "sql" / "views"
+OUTPUT_DIR = BASE_DIR / "data_outputs" / "sql_manual_runs"
 
-# 3. Create a helper function to read SQL files
-def read_sql_file(folder_path, filename):
-    """Reads and returns the SQL content from a file."""
-    file_path = os.path.join(folder_path, filename)
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
+PARAM_RE = re.compile(r"\$(\d+)")
 
-# 4. Helper: turn filename into readable title
-def format_sql_filename(filename):
+# ============================================================
+# 4️⃣ Helper functions
+# ============================================================
+
+def read_sql_file(path: Path) -> str:
+    """Read and return SQL file content."""
+    return path.read_text(encoding="utf-8")
+
+
+def format_sql_filename(filename: str) -> str:
     """Turns '25_bi_category_performance_by_gender.sql' → 'Category Performance By Gender'"""
-    name = os.path.splitext(filename)[0]  # remove .sql
-    # Remove any prefix like numbers or 'bi_'
+    name = Path(filename).stem
     parts = name.split("_")
-    # Filter out numeric and technical prefixes
     clean_parts = [p for p in parts if not p.isdigit() and p.lower() not in ("bi", "view")]
-    # Join words and capitalize
-    return " ".join(clean_parts).title()
+    return " ".join(clean_parts).title() or name
+
+
+def first_keyword(sql_text: str) -> str:
+    """Identify the first SQL keyword (e.g., SELECT, CREATE, INSERT)."""
+    for line in sql_text.splitlines():
+        s = line.strip()
+        if not s or s.startswith("--") or s.startswith("/*"):
+            continue
+        return s.split()[0].upper()
+    return ""
+
+
+def find_sql_file(name: str) -> Path:
+    """Resolve a file name (with or without .sql) against sql_queries, then views."""
+    candidate = Path(name)
+    if candidate.is_file():
+        return candidate
+    filename = name if name.lower().endswith(".sql") else f"{name}.sql"
+    for folder in (SQL_QUERIES_DIR, VIEWS_DIR):
+        path = folder / filename
+        if path.is_file():
+            return path
+    raise FileNotFoundError(f"SQL file not found: {filename}")
+
+
+def list_sql_files():
+    """Return all SQL files from both folders, sorted by folder then name."""
+    return [f for folder in (SQL_QUERIES_DIR, VIEWS_DIR) if folder.exists() for f in sorted(folder.glob("*.sql"))]
+
+
+def param_count(sql_text: str) -> int:
+    """Highest $N placeholder used in the SQL text (0 when not parameterized)."""
+    return max((int(n) for n in PARAM_RE.findall(sql_text)), default=0)
+
+
+# ============================================================
+# 5️⃣ Session: one connection, prepared statements, streaming
+# ============================================================
+class SqlSession:
+    """
+    Holds the single connection used by the REPL / one-shot runs.
+
+    Notes:
+    - prepared maps a SQL file path to (statement name, file mtime); a changed
+      file is DEALLOCATEd and prepared again on its next run.
+    - Parameterized files run through EXECUTE on a client cursor (Postgres cannot
+      DECLARE a cursor over EXECUTE), so their rows are paged from the client buffer.
+      Everything else streams from a server-side cursor.
+    """
+
+    def __init__(self, page_size: int = DEFAULT_PAGE_SIZE, timeout_ms: int = DEFAULT_STATEMENT_TIMEOUT_MS):
+        self.page_size = page_size
+        self.timeout_ms = timeout_ms
+        self.out_path = None
+        self.prepared = {}
+        # wait_select turns Ctrl-C during a query into a server-side cancel (QueryCanceledError)
+        psycopg2.extensions.set_wait_callback(psycopg2.extras.wait_select)
+        self.conn = psycopg2.connect(
+            host=PG_HOST,
+            port=PG_PORT,
+            user=PG_USER,
+            password=PG_PASSWORD,
+            dbname=PG_DATABASE,
+            options=f"-c statement_timeout={int(timeout_ms)}",
+        )
+
+    def close(self):
+        self.conn.close()
+        print("\n🔒 Connection closed.")
+
+    def set_timeout(self, timeout_ms: int):
+        with self.conn.cursor() as cur:
+            cur.execute("SET statement_timeout = %s", (int(timeout_ms),))
+        self.conn.commit()
+        self.timeout_ms = int(timeout_ms)
+        print(f"⏱ statement_timeout = {self.timeout_ms} ms")
+
+    def _prepare(self, path: Path, sql_text: str) -> str:
+        """Return the prepared statement name for path, (re)preparing it if needed."""
+        mtime = path.stat().st_mtime
+        cached = self.prepared.get(path)
+        if cached and cached[1] == mtime:
+            return cached[0]
+
+        # PREPARE/DEALLOCATE are session-level and survive rollback: drop the cache entry
+        # first and check the server, so a failed re-prepare never leaves a stale name behind
+        self.prepared.pop(path, None)
+        stmt_name = "stmt_" + re.sub(r"\W", "_", path.stem)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (stmt_name,))
+                if cur.fetchone():
+                    cur.execute(sql.SQL("DEALLOCATE {}").format(sql.Identifier(stmt_name)))
+                body = sql_text.strip().rstrip(";")
+                cur.execute(sql.SQL("PREPARE {} AS ").format(sql.Identifier(stmt_name)) + sql.SQL(body))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.prepared[path] = (stmt_name, mtime)
+        print(f"🧩 Prepared statement: {stmt_name}")
+        return stmt_name
+
+    def run_file(self, name: str, params=(), out_path: Path = None):
+        path = find_sql_file(name)
+        sql_text = read_sql_file(path)
+        print(f"\n---\n📄 File: {path.name}\n📌 Title: {format_sql_filename(path.name)}")
+
+        n_params = param_count(sql_text)
+        if n_params != len(params):
+            raise ValueError(f"{path.name} expects {n_params} parameter(s), got {len(params)}")
+
+        if n_params:
+            stmt_name = self._prepare(path, sql_text)
+            placeholders = sql.SQL(", ").join(sql.Placeholder() * n_params)
+            query = sql.SQL("EXECUTE {} ({})").format(sql.Identifier(stmt_name), placeholders)
+            self._run(query, params, first_keyword(sql_text), out_path, server_side=False)
+        else:
+            self._run(sql_text, None, first_keyword(sql_text), out_path, server_side=True)
+
+    def run_adhoc(self, sql_text: str, out_path: Path = None):
+        self._run(sql_text, None, first_keyword(sql_text), out_path, server_side=True)
+
+    def _run(self, query, params, kw, out_path, server_side):
+        try:
+            if kw not in ("SELECT", "WITH"):
+                start = time.perf_counter()
+                with self.conn.cursor() as cur:
+                    cur.execute(query, params)
+                    rowcount = cur.rowcount
+                self.conn.commit()
+                print(f"✅ Executed {kw or 'statement'} ({rowcount} rows affected) in {(time.perf_counter() - start) * 1000:.1f} ms")
+                return
+
+            cur = self.conn.cursor(name="manual_runner") if server_side else self.conn.cursor()
+            cur.itersize = self.page_size
+            try:
+                self._stream(cur, query, params, out_path or self.out_path)
+            finally:
+                cur.close()
+            self.conn.commit()
+
+        except psycopg2.extensions.QueryCanceledError as e:
+            self.conn.rollback()
+            print(f"⏰ Query cancelled (Ctrl-C or statement_timeout={self.timeout_ms} ms): {e}".strip())
+        except (Exception, KeyboardInterrupt):
+            self.conn.rollback()
+            raise
+
+    def _stream(self, cur, query, params, out_path):
+        """
+        Execute and hand rows out page by page.
+
+        Timing:
+        - execute = time until the first page is available (planning + execution start)
+        - fetch   = time spent pulling the remaining pages
+        """
+        start = time.perf_counter()
+        cur.execute(query, params)
+        page = cur.fetchmany(self.page_size)
+        exec_s = time.perf_counter() - start
 
-# 5. Assign your SQL queries to easy variable names
-file_query_1 = "05_bi_dataset_quick_sample.sql"
+        columns = [d[0] for d in cur.description]
+        total = 0
+        fetch_s = 0.0
+        writer = None
+        fh = None
+        interactive = out_path is None and sys.stdin.isatty() and sys.stdout.isatty()
 
-# Optional: you can change BASE_DIR to "sql_queries" if needed
-file_query_2 = "01_view_dataset_totals.sql"
+        try:
+            if out_path is not None:
+                out_path = Path(out_path)
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                fh = open(out_path, "w", newline="", encoding="utf-8")
+                writer = csv.writer(fh)
+                writer.writerow(columns)
 
-# variable names assigned
-sql_query_1 = read_sql_file(SQL_QUERIES_DIR, file_query_1)
+            while page:
+                total += len(page)
+                if writer is not None:
+                    writer.writerows(page)
+                else:
+                    print(pd.DataFrame(page, columns=columns).to_string(index=False, header=(total == len(page))))
+                    if interactive and len(page) == self.page_size:
+                        if input("-- more (Enter to continue, q to stop) -- ").strip().lower() == "q":
+                            break
 
-# Optional: you can change BASE_DIR to "sql_queries" if needed
-sql_query_2 = read_sql_file(VIEWS_DIR, file_query_2)
+                t0 = time.perf_counter()
+                page = cur.fetchmany(self.page_size)
+                fetch_s += time.perf_counter() - t0
+        finally:
+            if fh is not None:
+                fh.close()
 
-# 6. Connect to PostgreSQL ONCE (best practice)
-conn = psycopg2.connect(
-    host=PG_HOST,
-    port=PG_PORT,
-    user=PG_USER,
-    password=PG_PASSWORD,
-    dbname=PG_DATABASE
-)
+        print(f"▶ Rows: {total} | ⏱ execute {exec_s * 1000:.1f} ms | fetch {fetch_s * 1000:.1f} ms")
+        if out_path is not None:
+            print(f"✅ Saved CSV: {out_path}")
 
-# 7. Run your queries — and store results in DataFrames
-df_query_1 = pd.read_sql(sql_query_1, conn)
-df_query_2 = pd.read_sql(sql_query_2, conn)
 
-# 8. Preview and verify results — now includes filenames
-print(f"\n📄 Running File: {file_query_1}")
-print(f"📊 Query 1 Title: {format_sql_filename(file_query_1)}")
-print(df_query_1.head())
+# ============================================================
+# 6️⃣ REPL
+# ============================================================
+def repl(session: SqlSession):
+    print("🐘 SQL runner — \\files, \\run <file> [params], \\page <n>, \\timeout <ms>, \\out <path|off>, \\q")
+    buffer = []
+    while True:
+        try:
+            line = input("sql> " if not buffer else "...> ")
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
 
-print(f"\n📄 Running File: {file_query_2}")
-print(f"📊 Query 2 Title: {format_sql_filename(file_query_2)}")
-print(df_query_2.head())
+        stripped = line.strip()
+        if not buffer and stripped.startswith("\\"):
+            # drop the backslash before shlex: in POSIX mode it would be read as an escape
+            cmd, *args = shlex.split(stripped[1:]) or [""]
+            try:
+                if cmd == "q":
+                    break
+                elif cmd == "files":
+                    for f in list_sql_files():
+                        print(f"  {f.parent.name}/{f.name}")
+                elif cmd == "run" and args:
+                    session.run_file(args[0], args[1:])
+                elif cmd == "page" and args:
+                    session.page_size = int(args[0])
+                    print(f"📄 page size = {session.page_size}")
+                elif cmd == "timeout" and args:
+                    session.set_timeout(int(args[0]))
+                elif cmd == "out" and args:
+                    session.out_path = None if args[0] == "off" else Path(args[0])
+                    print(f"📁 output = {session.out_path or 'terminal'}")
+                else:
+                    print(f"⚠️ Unknown command or missing argument: {stripped}")
+            except KeyboardInterrupt:
+                print("\n⛔ Cancelled.")
+            except Exception as e:
+                print(f"❌ {e}")
+            continue
 
+        if stripped:
+            buffer.append(line)
+        if buffer and stripped.endswith(";"):
+            try:
+                session.run_adhoc("\n".join(buffer))
+            except KeyboardInterrupt:
+                print("\n⛔ Cancelled.")
+            except Exception as e:
+                print(f"❌ {e}")
+            buffer = []
 
-# ========================================================================================================
-# 9. Optional — Save to CSV for later use (now stores in data_outputs/sql_manual_runs)
-OUTPUT_DIR = os.path.join(BASE_DIR, "data_outputs", "sql_manual_runs")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-df_query_1.to_csv(os.path.join(OUTPUT_DIR, f"{os.path.splitext(file_query_1)[0]}.csv"), index=False)
-df_query_2.to_csv(os.path.join(OUTPUT_DIR, f"{os.path.splitext(file_query_2)[0]}.csv"), index=False)
+# ============================================================
+# 7️⃣ Run script
+# ============================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run SQL files or an interactive SQL session against PostgreSQL.")
+    parser.add_argument("files", nargs="*", help="SQL files to run (name, stem or path); omit to start the REPL")
+    parser.add_argument("-p", "--param", action="append", default=[], help="value for $1, $2, ... (repeat in order)")
+    parser.add_argument("--csv", action="store_true", help="save each result to data_outputs/sql_manual_runs/<stem>.csv")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="rows fetched per page")
+    parser.add_argument("--timeout-ms", type=int, default=DEFAULT_STATEMENT_TIMEOUT_MS, help="statement_timeout in ms")
+    args = parser.parse_args(argv)
 
-# ========================================================================================================
+    session = SqlSession(page_size=args.page_size, timeout_ms=args.timeout_ms)
+    try:
+        if not args.files:
+            repl(session)
+            return
+        for name in args.files:
+            out_path = OUTPUT_DIR / f"{Path(name).stem}.csv" if args.csv else None
+            try:
+                session.run_file(name, args.param, out_path=out_path)
+            except Exception as e:
+                print(f"❌ Error in {name}: {e}")
+    finally:
+        session.close()
 
-# 10. Close the connection
-conn.close()
 
-print("\n✅ SQL queries executed, previewed, and saved successfully!")
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,36 @@ Behavior:
  - Runs all BI SQL files automatically.
  - SELECT/WITH queries → Fetch results → Save as CSV in data_outputs/bi/
  - CREATE/INSERT/UPDATE → Executes and commits changes.
- - Errors are caught per file so execution continues.
+ - Errors are caught per file so execution continues; failed file names are returned.
+ - With a CheckpointStore (pipeline --resume), files already completed on the same inputs are skipped.
+ - Refreshes the timeseries_metrics_<grain> views first so _view_ files read current definitions.
+ - Per-file budgets from a header comment are enforced and violations reported, e.g.
+       -- Budget: max_runtime=30s max_rows=1000 work_mem=64MB
+   max_runtime → SET LOCAL statement_timeout + server-side cancel of the whole file,
+   max_rows → stop fetching once exceeded, work_mem → SET LOCAL work_mem.
+   Files without a header use the BI_MAX_RUNTIME / BI_MAX_ROWS / BI_WORK_MEM defaults.
+   A file that goes over budget, or has an invalid header, is reported as a violation
+   and its previous CSV is removed so the report never picks up stale results.
 """
 
 # ============================================================
 # 1️⃣ Import libraries and load environment variables
 # ============================================================
 import os
+import re
+import time
+import threading
 from pathlib import Path
 import psycopg2
 import pandas as pd
 from dotenv import load_dotenv
 import traceback
 
+try:
+    from sql_scripts.timeseries_metrics import create_timeseries_metrics_views
+except ImportError:
+    from timeseries_metrics import create_timeseries_metrics_views
+
 load_dotenv()
 
 # ============================================================
@@ -42,6 +59,30 @@ VIEWS_DIR = BASE_DIR / "sql" / "views"
 OUTPUT_DIR = BASE_DIR / "data_outputs" / "bi"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# ============================================================
+# 3️⃣b Default per-file budgets (overridden by a "-- Budget:" header)
+# ============================================================
+DEFAULT_BUDGET = {
+    "max_runtime": os.getenv("BI_MAX_RUNTIME", "300s"),
+    "max_rows": os.getenv("BI_MAX_ROWS", "1000000"),
+    "work_mem": os.getenv("BI_WORK_MEM", ""),
+}
+CANCEL_GRACE_S = 5          # client-side cancel fires this long after max_runtime
+FETCH_PAGE_SIZE = 10000     # rows per server-side cursor fetch
+
+BUDGET_RE = re.compile(r"^\s*--\s*budget:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s|min|h)?\s*$", re.IGNORECASE)
+
+
+class BudgetExceeded(Exception):
+    """A SQL file went over one of its budgets. Deterministic, so it is never retried."""
+    retryable = False
+
+
+class BudgetHeaderError(ValueError):
+    """A '-- Budget:' header could not be parsed. Fixing it needs an edit, so it is never retried."""
+    retryable = False
+
 # ============================================================
 # 4️⃣ Helper functions
 # ============================================================
@@ -66,6 +107,52 @@ def first_keyword(sql_text: str) -> str:
         return s.split()[0].upper()
     return ""
 
+def parse_duration_ms(value: str) -> int:
+    """Convert '500ms', '30s', '2min', '1h' or a bare number of seconds to milliseconds."""
+    m = DURATION_RE.match(str(value))
+    if not m:
+        raise BudgetHeaderError(f"Invalid duration: {value!r}")
+    factor = {"ms": 1, "s": 1000, "min": 60_000, "h": 3_600_000}[(m.group(2) or "s").lower()]
+    return int(float(m.group(1)) * factor)
+
+def parse_budget(sql_text: str) -> dict:
+    """
+    Read the '-- Budget: key=value ...' header and merge it over DEFAULT_BUDGET.
+
+    Returns {"max_runtime_ms": int, "max_rows": int, "work_mem": str}; 0 / "" mean unlimited / server default.
+    """
+    budget = dict(DEFAULT_BUDGET)
+    for m in BUDGET_RE.finditer(sql_text):
+        for pair in m.group(1).split():
+            key, _, value = pair.partition("=")
+            key = key.strip().lower()
+            if key not in budget:
+                raise BudgetHeaderError(f"Unknown budget key: {key!r}")
+            budget[key] = value.strip()
+    if not re.fullmatch(r"\d*", budget["max_rows"].strip()):
+        raise BudgetHeaderError(f"Invalid max_rows: {budget['max_rows']!r}")
+    return {
+        "max_runtime_ms": parse_duration_ms(budget["max_runtime"]) if budget["max_runtime"] else 0,
+        "max_rows": int(budget["max_rows"] or 0),
+        "work_mem": budget["work_mem"],
+    }
+
+def fetch_with_row_budget(conn, sql_text: str, max_rows: int) -> pd.DataFrame:
+    """Stream a SELECT through a server-side cursor, raising BudgetExceeded past max_rows."""
+    rows = []
+    with conn.cursor(name="bi_runner") as cur:
+        cur.itersize = FETCH_PAGE_SIZE
+        cur.execute(sql_text)
+        while True:
+            page = cur.fetchmany(FETCH_PAGE_SIZE)
+            if not page:
+                break
+            rows.extend(page)
+            if max_rows and len(rows) > max_rows:
+                raise BudgetExceeded(f"max_rows={max_rows} exceeded")
+        columns = [d[0] for d in cur.description]
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
 def find_bi_and_view_sql_files(*folders):
     """Search given folders for files containing '_bi_' or '_view_'."""
     files = []
@@ -84,12 +171,82 @@ def find_bi_and_view_sql_files(*folders):
 # ============================================================
 # 5️⃣ Main function to run BI SQL files
 # ============================================================
-def run_all_bi_queries():
+def run_sql_file(conn, sql_path: Path, sql_text: str):
+    """
+    Run one SQL file within its budget: SELECT/WITH → CSV in OUTPUT_DIR, anything else → execute and commit.
+
+    Raises BudgetExceeded when the file is cancelled for max_runtime or returns more than max_rows,
+    BudgetHeaderError when its budget header is invalid. The previous CSV is removed up front,
+    so a failed run leaves no stale output behind.
+    """
+    out_csv = OUTPUT_DIR / f"{sql_path.stem}.csv"
+    out_csv.unlink(missing_ok=True)
+
+    kw = first_keyword(sql_text)
+    budget = parse_budget(sql_text)
+    runtime_ms = budget["max_runtime_ms"]
+
+    # Step 5.3b — Apply the budget to this transaction only, and arm a client-side cancel
+    # so a file cannot outlive max_runtime across several statements / cursor fetches
+    with conn.cursor() as cur:
+        if runtime_ms:
+            cur.execute("SET LOCAL statement_timeout = %s", (runtime_ms,))
+        if budget["work_mem"]:
+            cur.execute("SET LOCAL work_mem = %s", (budget["work_mem"],))
+    watchdog = None
+    if runtime_ms:
+        watchdog = threading.Timer(runtime_ms / 1000 + CANCEL_GRACE_S, conn.cancel)
+        watchdog.daemon = True
+        watchdog.start()
+
+    start = time.perf_counter()
+    try:
+        # Step 5.4 — If it's a SELECT/WITH query → fetch results
+        if kw in ("SELECT", "WITH"):
+            df = fetch_with_row_budget(conn, sql_text, budget["max_rows"])
+            conn.commit()
+            print(f"▶ Rows fetched: {len(df)} in {time.perf_counter() - start:.2f}s")
+            print(df.head(5).to_string(index=False))
+            df.to_csv(out_csv, index=False)
+            print(f"✅ Saved CSV: {out_csv}")
+
+        # Step 5.5 — If it's DDL/DML → execute and commit
+        else:
+            with conn.cursor() as cur:
+                cur.execute(sql_text)
+            conn.commit()
+            print(f"✅ Executed DDL/DML (keyword: {kw}) in {time.perf_counter() - start:.2f}s")
+
+    except psycopg2.extensions.QueryCanceledError as e:
+        conn.rollback()
+        raise BudgetExceeded(
+            f"max_runtime={runtime_ms}ms exceeded, cancelled after {time.perf_counter() - start:.2f}s"
+        ) from e
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+
+
+def run_all_bi_queries(checkpoints=None, upstream: str = ""):
+    """
+    Run every _bi_/_view_ SQL file and return the names of the files that failed.
+
+    Notes:
+    - checkpoints (optional CheckpointStore): files already completed with the same
+      fingerprint (upstream + SQL text) are skipped; failures are retried with backoff.
+    - upstream: fingerprint of the loaded data, so new data re-runs every file.
+    """
+    failed = []
+    violations = []
+
      # Step 5.1 — Find all _bi_ and _view_ SQL files
     sql_files = find_bi_and_view_sql_files(SQL_QUERIES_DIR, VIEWS_DIR)
     if not sql_files:
         print("⚠️ No _bi_ or _view_ SQL files found in folders.")
-        return
+        return failed
 
     print(f"📁 Found {len(sql_files)} BI/VIEW SQL files. Running them...\n")
 
@@ -103,32 +260,40 @@ def run_all_bi_queries():
     )
 
     try:
-        # Step 5.3 — Loop through each SQL file
+        # Step 5.2b — Refresh the time-series metrics views (day/week/month)
+        try:
+            create_timeseries_metrics_views(conn)
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Error refreshing time-series metrics views: {e}")
+            traceback.print_exc()
+
+        # Step 5.3 — Loop through each SQL file (skipping files checkpointed with the same inputs)
         for sql_path in sql_files:
+            unit = f"sql:{sql_path.parent.name}/{sql_path.name}"
             try:
                 sql_text = read_sql_file(sql_path)
                 title = format_sql_filename(sql_path.name)
                 print(f"\n---\n📄 File: {sql_path.name}\n📌 Title: {title}")
 
-                kw = first_keyword(sql_text)
-
-                # Step 5.4 — If it's a SELECT/WITH query → fetch results
-                if kw in ("SELECT", "WITH"):
-                    df = pd.read_sql(sql_text, conn)
-                    print(f"▶ Rows fetched: {len(df)}")
-                    print(df.head(5).to_string(index=False))
-                    out_csv = OUTPUT_DIR / f"{sql_path.stem}.csv"
-                    df.to_csv(out_csv, index=False)
-                    print(f"✅ Saved CSV: {out_csv}")
-
-                # Step 5.5 — If it's DDL/DML → execute and commit
+                if checkpoints is None:
+                    run_sql_file(conn, sql_path, sql_text)
                 else:
-                    with conn.cursor() as cur:
-                        cur.execute(sql_text)
-                    conn.commit()
-                    print(f"✅ Executed DDL/DML (keyword: {kw})")
+                    checkpoints.run(
+                        unit,
+                        checkpoints.fingerprint(upstream, sql_text),
+                        lambda: run_sql_file(conn, sql_path, sql_text),
+                        on_retry=conn.rollback,
+                    )
+
+            except (BudgetExceeded, BudgetHeaderError) as e:
+                failed.append(sql_path.name)
+                violations.append((sql_path.name, str(e)))
+                print(f"⛔ Budget violation in {sql_path.name}: {e}")
 
             except Exception as e:
+                conn.rollback()
+                failed.append(sql_path.name)
                 print(f"❌ Error in {sql_path.name}: {e}")
                 traceback.print_exc()
 
@@ -137,6 +302,14 @@ def run_all_bi_queries():
         conn.close()
         print("\n🔒 Connection closed.")
 
+    if violations:
+        print(f"\n⛔ {len(violations)} budget violation(s):")
+        for name, reason in violations:
+            print(f"   - {name}: {reason}")
+    if failed:
+        print(f"⚠️ {len(failed)} SQL file(s) failed: {', '.join(failed)}")
+    return failed
+
 # ============================================================
 # 6️⃣ Run script
 # ============================================================
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Time-series metrics engine for the retail_sales rollup cube.
+
+Creates one view per grain (timeseries_metrics_day / _week / _month) holding
+period-over-period (MoM at month grain), YoY, YTD and rolling-N metrics.
+
+How it works:
+ - Aggregates retail_sales_cube to the requested grain once.
+ - Fills gaps with a dense period series so LAG/ROWS offsets mean "N periods back".
+ - Evaluates every metric with window functions over the aggregate (no self-joins),
+   in two sorts of the (small) period series: period_start for LAG, rolling and
+   YoY, and (year, period_start) for the YTD partitions. LAG is evaluated once and
+   reused for the growth percentages.
+ - YoY matches period_start - 1 year on the calendar (day and month grain), so leap
+   days do not shift the comparison; week grain compares with 52 weeks (364 days)
+   earlier, since a week start one calendar year back is not a week start.
+ - Unique customers at month grain are unions of the per-month customer bitmaps
+   (bit_or + bit_count), and the same union over the YTD window gives
+   ytd_unique_customers. The cube holds no customer sets (they would grow with
+   cells x customers), so day/week grain counts distinct customers from retail_sales
+   once per (period, customer) and gets YTD as a running sum of customers seen for
+   the first time in the year.
+ - monthly_mom, monthly_ytd_performance and sales_and_customers_mom_ytd are plain
+   projections of timeseries_metrics_month (no view-on-view joins).
+
+Usage:
+ - Called from run_all_bi_queries() before the BI/VIEW files run.
+ - Standalone: python sql_scripts/timeseries_metrics.py [--rolling 3] [--print]
+"""
+
+# ============================================================
+# 1️⃣ Import libraries and load environment variables
+# ============================================================
+import os
+import argparse
+import psycopg2
+from psycopg2 import sql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ============================================================
+# 2️⃣ Load PostgreSQL credentials from .env
+# ============================================================
+PG_HOST = os.getenv("PG_HOST", "localhost")
+PG_PORT = os.getenv("PG_PORT", "5432")
+PG_USER = os.getenv("PG_USER")
+PG_PASSWORD = os.getenv("PG_PASSWORD")
+PG_DATABASE = os.getenv("PG_DATABASE")
+PG_SCHEMA = os.getenv("PG_SCHEMA", "public")
+
+TABLE = "retail_sales"
+CUBE_TABLE = "retail_sales_cube"
+CUSTOMER_SKETCH_TABLE = "retail_sales_customer_sketch"
+DEFAULT_ROLLING_PERIODS = int(os.getenv("TS_ROLLING_PERIODS", "3"))
+
+# ============================================================
+# 3️⃣ Grain settings: date_trunc unit, series step, YoY offset (period_start - offset)
+# ============================================================
+GRAINS = {
+    "day": {"step": "1 day", "yoy_offset": "1 year"},
+    "week": {"step": "1 week", "yoy_offset": "52 weeks"},
+    "month": {"step": "1 month", "yoy_offset": "1 year"},
+}
+
+# ============================================================
+# 4️⃣ SQL builder
+# ============================================================
+
+def view_name(grain: str) -> str:
+    """'month' → 'timeseries_metrics_month'."""
+    return f"timeseries_metrics_{grain}"
+
+
+def build_timeseries_metrics_sql(grain: str = "month", rolling_periods: int = DEFAULT_ROLLING_PERIODS) -> sql.Composed:
+    """
+    Build the SELECT computing every time-series metric for one grain.
+
+    Inputs:
+    - grain: 'day', 'week' or 'month'
+    - rolling_periods: window length N for rolling_revenue / rolling_units
+
+    Returns:
+    - psycopg2.sql.Composed SELECT (wrap it in CREATE VIEW or run it directly)
+
+    Notes:
+    - prev_period_revenue is the previous period at the chosen grain (MoM for month).
+    - prev_year_revenue is the period starting exactly yoy_offset earlier: the same
+      calendar date one year back for day/month grain (2024-03-01 → 2023-03-01),
+      52 weeks (364 days) back for week grain. NULL when that period is outside the data.
+    - YTD resets on the calendar year of period_start.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}', expected one of: {', '.join(GRAINS)}")
+    if rolling_periods < 1:
+        raise ValueError("rolling_periods must be >= 1")
+
+    settings = GRAINS[grain]
+    if grain == "month":
+        # ytd_part is the month's customer bitmap; the YTD window unions the bitmaps
+        customers_cte = sql.SQL("""
+  SELECT
+    month_start                            AS period_start,
+    bit_count(bit_or(customers))           AS unique_customers,
+    bit_or(customers)                      AS ytd_part
+  FROM {sketch}
+  GROUP BY 1""").format(sketch=sql.SQL("{}.{}").format(sql.Identifier(PG_SCHEMA), sql.Identifier(CUSTOMER_SKETCH_TABLE)))
+        ytd_customers = sql.SQL("bit_count(bit_or(ytd_part) OVER w_ytd)")
+    else:
+        # ytd_part counts customers whose first period of the year is this one
+        customers_cte = sql.SQL("""
+  SELECT
+    period_start,
+    COUNT(*)                                                  AS unique_customers,
+    COUNT(*) FILTER (WHERE period_start = first_period_start) AS ytd_part
+  FROM (
+    SELECT
+      period_start,
+      MIN(period_start) OVER (PARTITION BY EXTRACT(YEAR FROM period_start), customer_id) AS first_period_start
+    FROM (
+      SELECT DATE_TRUNC({grain}, date)::date AS period_start, customer_id
+      FROM {raw}
+      WHERE date IS NOT NULL AND customer_id IS NOT NULL
+      GROUP BY 1, 2
+    ) pc
+  ) f
+  GROUP BY 1""").format(
+            grain=sql.Literal(grain),
+            raw=sql.SQL("{}.{}").format(sql.Identifier(PG_SCHEMA), sql.Identifier(TABLE)),
+        )
+        ytd_customers = sql.SQL("SUM(ytd_part) OVER w_ytd")
+
+    return sql.SQL("""
+WITH agg AS (
+  SELECT
+    DATE_TRUNC({grain}, sale_date)::date AS period_start,
+    SUM(total_amount)                    AS total_revenue,
+    SUM(total_quantity)::bigint          AS total_units,
+    SUM(transactions_count)::bigint      AS transactions_count
+  FROM {cube}
+  WHERE sale_date IS NOT NULL
+  GROUP BY 1
+),
+customers AS ({customers_cte}
+),
+periods AS (
+  SELECT generate_series(MIN(period_start), MAX(period_start), {step}::interval)::date AS period_start
+  FROM agg
+),
+series AS (
+  SELECT
+    p.period_start,
+    EXTRACT(YEAR FROM p.period_start)     AS period_year,
+    COALESCE(a.total_revenue, 0)          AS total_revenue,
+    COALESCE(a.total_units, 0)            AS total_units,
+    COALESCE(a.transactions_count, 0)     AS transactions_count,
+    COALESCE(c.unique_customers, 0)       AS unique_customers,
+    c.ytd_part
+  FROM periods p
+  LEFT JOIN agg a USING (period_start)
+  LEFT JOIN customers c USING (period_start)
+),
+windowed AS (
+  SELECT
+    s.*,
+    LAG(total_revenue) OVER w                  AS prev_period_revenue,
+    FIRST_VALUE(total_revenue) OVER w_prev_year AS prev_year_revenue,
+    SUM(total_revenue) OVER w_ytd              AS ytd_revenue,
+    SUM(total_units) OVER w_ytd                AS ytd_units,
+    SUM(total_revenue) OVER w_rolling          AS rolling_revenue,
+    SUM(total_units) OVER w_rolling            AS rolling_units,
+    COALESCE({ytd_customers}, 0)               AS ytd_unique_customers
+  FROM series s
+  WINDOW
+    w AS (ORDER BY period_start),
+    w_ytd AS (PARTITION BY period_year ORDER BY period_start),
+    w_rolling AS (w ROWS BETWEEN {rolling_preceding} PRECEDING AND CURRENT ROW),
+    w_prev_year AS (ORDER BY period_start RANGE BETWEEN {yoy_offset}::interval PRECEDING AND {yoy_offset}::interval PRECEDING)
+)
+SELECT
+  {grain}                                   AS grain,
+  period_start,
+  period_year                               AS year,
+  EXTRACT(MONTH FROM period_start)          AS month,
+  total_revenue,
+  total_units,
+  transactions_count,
+  unique_customers,
+  prev_period_revenue,
+  ROUND((total_revenue - prev_period_revenue) / NULLIF(prev_period_revenue, 0) * 100, 2) AS pop_revenue_growth_pct,
+  prev_year_revenue,
+  ROUND((total_revenue - prev_year_revenue) / NULLIF(prev_year_revenue, 0) * 100, 2)     AS yoy_revenue_growth_pct,
+  ytd_revenue,
+  ytd_units,
+  {rolling_periods}                         AS rolling_periods,
+  rolling_revenue,
+  rolling_units,
+  ytd_unique_customers::bigint              AS ytd_unique_customers
+FROM windowed
+ORDER BY period_start
+""").format(
+        grain=sql.Literal(grain),
+        step=sql.Literal(settings["step"]),
+        yoy_offset=sql.Literal(settings["yoy_offset"]),
+        rolling_preceding=sql.Literal(rolling_periods - 1),
+        rolling_periods=sql.Literal(rolling_periods),
+        customers_cte=customers_cte,
+        ytd_customers=ytd_customers,
+        cube=sql.SQL("{}.{}").format(sql.Identifier(PG_SCHEMA), sql.Identifier(CUBE_TABLE)),
+    )
+
+
+def create_timeseries_metrics_views(conn, grains=tuple(GRAINS), rolling_periods: int = DEFAULT_ROLLING_PERIODS):
+    """
+    CREATE OR REPLACE the timeseries_metrics_<grain> views and commit.
+
+    Notes:
+    - Views are replaced in place (column list is fixed), so dependent views such as
+      monthly_mom keep working across runs.
+    """
+    with conn.cursor() as cur:
+        for grain in grains:
+            cur.execute(
+                sql.SQL("CREATE OR REPLACE VIEW {}.{} AS ").format(
+                    sql.Identifier(PG_SCHEMA), sql.Identifier(view_name(grain))
+                ) + build_timeseries_metrics_sql(grain, rolling_periods)
+            )
+            print(f"✅ View refreshed: {view_name(grain)}")
+    conn.commit()
+
+
+# ============================================================
+# 5️⃣ Run script
+# ============================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the timeseries_metrics_<grain> views.")
+    parser.add_argument("--grain", choices=list(GRAINS), action="append", help="grain(s) to build (default: all)")
+    parser.add_argument("--rolling", type=int, default=DEFAULT_ROLLING_PERIODS, help="rolling window length in periods")
+    parser.add_argument("--print", dest="print_only", action="store_true", help="print the SQL instead of creating views")
+    args = parser.parse_args()
+    grains = args.grain or list(GRAINS)
+
+    conn = psycopg2.connect(
+        host=PG_HOST,
+        port=PG_PORT,
+        user=PG_USER,
+        password=PG_PASSWORD,
+        dbname=PG_DATABASE
+    )
+    try:
+        if args.print_only:
+            for grain in grains:
+                print(f"-- {view_name(grain)}")
+                print(build_timeseries_metrics_sql(grain, args.rolling).as_string(conn))
+        else:
+            create_timeseries_metrics_views(conn, grains, args.rolling)
+    finally:
+        conn.close()